@@ -2,9 +2,13 @@
 Samsung Global Sales — Streamlit EDA App
 =========================================
 Run with:
-    pip install streamlit pandas numpy plotly seaborn matplotlib
+    pip install "streamlit>=1.52" "pandas>=2.2" "numpy>=1.22" "plotly>=5.0" \
+        "pyarrow>=10.0.1" seaborn matplotlib
+    (or: pip install -r requirements.txt)
     streamlit run samsung_eda_streamlit.py
 """
+import io
+
 import pandas as pd
 import streamlit as st
 import numpy as np
@@ -17,7 +21,7 @@ st.set_page_config(page_title="Samsung Global Sales EDA",
                    page_icon="📱", layout="wide", initial_sidebar_state="expanded")
 
 # ── Custom CSS ────────────────────────────────────────────────────────────────
-st.markdown("""
+CSS = """
 <style>
     [data-testid="stAppViewContainer"] { background-color: #050a14; }
     [data-testid="stSidebar"] { background-color: #0b1627; }
@@ -31,19 +35,239 @@ st.markdown("""
     p, label, .stMarkdown { color: #6b85a8 !important; }
     .block-container { padding-top: 1.5rem; }
 </style>
-""", unsafe_allow_html=True)
+"""
+# Streamlit drops any element a rerun does not emit again, so the style block
+# has to be written on every run rather than once per session.
+st.markdown(CSS, unsafe_allow_html=True)
 
 COLORS = px.colors.qualitative.Bold
+# Above this many rows the price/revenue scatter is binned server-side.
+SCATTER_MAX_POINTS = 10_000
+
+
+def fast_hist(series: pd.Series, nbins: int = 50, label: str = ""):
+    """Histogram binned with NumPy so only the bin counts are sent to Plotly."""
+    counts, edges = np.histogram(series.dropna().to_numpy(), bins=nbins)
+    mids = (edges[:-1] + edges[1:]) / 2
+    fig = px.bar(x=mids, y=counts, color_discrete_sequence=["#1565ff"],
+                 template="plotly_dark", labels={"x": label, "y": "count"})
+    fig.update_traces(width=edges[1] - edges[0])
+    fig.update_layout(bargap=0)
+    return fig
+
+
+def fast_box(df: pd.DataFrame, col: str, by: str, label: str = ""):
+    """Box plot from per-group quartiles and Tukey whiskers, plus the outliers."""
+    fig = go.Figure()
+    for i, (name, vals) in enumerate(df.groupby(by, observed=True)[col]):
+        a = vals.dropna().to_numpy(dtype=np.float64)
+        if a.size == 0:
+            continue
+        q1, med, q3 = np.percentile(a, [25, 50, 75])
+        iqr = q3 - q1
+        inside = (a >= q1 - 1.5 * iqr) & (a <= q3 + 1.5 * iqr)
+        color = COLORS[i % len(COLORS)]
+        fig.add_trace(go.Box(
+            x=[str(name)], name=str(name), q1=[q1], median=[med], q3=[q3],
+            lowerfence=[a[inside].min()], upperfence=[a[inside].max()],
+            marker_color=color, legendgroup=str(name)))
+        # Only the points beyond the whiskers are shipped, not the whole group.
+        outliers = a[~inside]
+        fig.add_trace(go.Scatter(
+            x=[str(name)] * outliers.size, y=outliers, mode="markers",
+            name=str(name), marker_color=color, legendgroup=str(name),
+            showlegend=False))
+    fig.update_layout(template="plotly_dark", yaxis_title=label)
+    return fig
 
 # ── Load data ─────────────────────────────────────────────────────────────────
 
 
+CATEGORICAL_COLS = ["quarter", "region", "country", "category", "product_name",
+                    "is_5g", "sales_channel", "payment_method", "customer_segment",
+                    "customer_age_group", "previous_device_os", "return_status"]
+
+
+NUMERIC_COLS = ["unit_price_usd", "discount_pct", "units_sold",
+                "discounted_price_usd", "revenue_usd", "customer_rating"]
+
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    # sale_date is already parsed by read_csv; only the few year labels become str.
+    df["year"] = df["year"].astype("category").cat.rename_categories(str)
+    # Nullable so rows with a blank sale_date still load.
+    df["month_num"] = df["sale_date"].dt.month.astype("Int8")
+    for c in CATEGORICAL_COLS:
+        df[c] = df[c].astype("category")
+    # Narrowest int/float that holds each column; halves the bytes every scan reads.
+    for c in NUMERIC_COLS:
+        kind = "integer" if pd.api.types.is_integer_dtype(df[c]) else "float"
+        df[c] = pd.to_numeric(df[c], downcast=kind)
+    return df
+
+
+def _read_csv(src) -> pd.DataFrame:
+    # Multithreaded Arrow parser, Arrow-backed columns until _prepare narrows them.
+    return pd.read_csv(src, engine="pyarrow", dtype_backend="pyarrow",
+                       parse_dates=["sale_date"])
+
+
 @st.cache_data
 def load_data(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path, parse_dates=["sale_date"])
-    df["year"] = df["year"].astype(str)
-    df["month_num"] = pd.to_datetime(df["sale_date"]).dt.month
-    return df
+    return _prepare(_read_csv(path))
+
+
+@st.cache_data(show_spinner=False)
+def _parse_uploaded(file_bytes: bytes) -> pd.DataFrame:
+    # Keyed on the raw bytes so reruns with the same upload skip the parse.
+    return _prepare(_read_csv(io.BytesIO(file_bytes)))
+
+
+# ── Filters & aggregations ────────────────────────────────────────────────────
+def _codes_in(s: pd.Series, values) -> np.ndarray:
+    # Membership on the integer category codes rather than the string values.
+    codes = s.cat.categories.get_indexer(list(values))
+    return np.isin(s.cat.codes.to_numpy(), codes[codes >= 0])
+
+
+def _apply_filters(df: pd.DataFrame, years, regions, categories) -> pd.DataFrame:
+    return df[
+        _codes_in(df["year"], years) &
+        _codes_in(df["region"], regions) &
+        _codes_in(df["category"], categories)
+    ]
+
+
+def _counts(s: pd.Series, name: str) -> pd.DataFrame:
+    # value_counts on a categorical also lists filtered-out categories as 0.
+    vc = s.value_counts()
+    return vc[vc > 0].rename_axis(name).reset_index(name="count")
+
+
+def _top_by_revenue(df: pd.DataFrame, col: str, n: int) -> pd.DataFrame:
+    # Per-category totals via bincount on the codes, then a partial sort for top n.
+    s = df[col]
+    codes = s.cat.codes.to_numpy()
+    valid = codes >= 0
+    k = len(s.cat.categories)
+    # Blank revenue counts as 0, like groupby().sum() skipping NaN.
+    rev = df["revenue_usd"].to_numpy(dtype=np.float64, na_value=0.0)
+    totals = np.bincount(codes[valid], weights=rev[valid], minlength=k)
+    seen = np.flatnonzero(np.bincount(codes[valid], minlength=k))
+    top = seen[np.argpartition(totals[seen], -min(n, len(seen)))[-n:]]
+    top = top[np.argsort(totals[top])[::-1]]
+    return pd.DataFrame({col: s.cat.categories[top], "revenue_usd": totals[top]})
+
+
+CUBE_KEYS = ["year", "quarter", "month_num", "region", "category",
+             "sales_channel", "customer_segment"]
+
+
+@st.cache_data(show_spinner=False)
+def aggregate(file_bytes: bytes, years_t: tuple, regions_t: tuple,
+              cats_t: tuple) -> dict:
+    """Every grouped frame the pages plot, keyed by upload and filter selection."""
+    df = _apply_filters(_parse_uploaded(file_bytes), years_t, regions_t, cats_t)
+
+    # One scan over df into a small cube; the low-cardinality views below are
+    # re-aggregated from it instead of grouping the full frame each time.
+    # dropna=False keeps rows with a blank key; each rollup drops only its own.
+    cube = df.groupby(CUBE_KEYS, observed=True, dropna=False).agg(
+        revenue_usd=("revenue_usd", "sum"),
+        n=("revenue_usd", "count"),
+        rating_sum=("customer_rating", "sum"),
+        rating_n=("customer_rating", "count"),
+    )
+
+    def rollup(keys) -> pd.DataFrame:
+        return cube.groupby(level=keys, observed=True).sum()
+
+    def rev(keys) -> pd.Series:
+        return rollup(keys)["revenue_usd"]
+
+    monthly = rev(["year", "month_num"]).reset_index()
+    monthly["period"] = pd.PeriodIndex.from_fields(
+        year=monthly["year"].astype(int), month=monthly["month_num"].astype(int),
+        freq="M").astype(str)
+
+    by_cat = rollup("category")
+    by_ch = rollup("sales_channel")
+
+    # Headline KPIs as single NumPy reductions over the raw columns.
+    rev_arr = df["revenue_usd"].to_numpy(dtype=np.float64, na_value=np.nan)
+    ret = df["return_status"]
+    returned = ret.cat.categories.get_indexer(["Returned"])[0]
+    kpis = {
+        "revenue": np.nansum(rev_arr),
+        "aov": np.nanmean(rev_arr),
+        "return_rate": (ret.cat.codes.to_numpy() == returned).mean() if returned >= 0 else 0.0,
+        "rating": np.nanmean(df["customer_rating"].to_numpy(dtype=np.float64, na_value=np.nan)),
+        "discount": np.nanmean(df["discount_pct"].to_numpy(dtype=np.float64, na_value=np.nan)),
+    }
+
+    return {
+        # Overview
+        "kpis": kpis,
+        "rev_by_year": rev("year").reset_index(),
+        "rev_by_quarter": rev("quarter").reset_index(),
+        "monthly": monthly,
+        "rev_year_quarter": rev(["year", "quarter"]).unstack("quarter", fill_value=0),
+        # Product
+        "rev_by_category": by_cat["revenue_usd"].sort_values(
+            ascending=True).reset_index(),
+        "top_products": _top_by_revenue(df, "product_name", 15),
+        "rev_by_5g": df.groupby("is_5g", observed=True)[
+            "revenue_usd"].sum().reset_index(),
+        "category_counts": _counts(df["category"], "category"),
+        "rating_by_category": (by_cat["rating_sum"] / by_cat["rating_n"]).rename(
+            "customer_rating").sort_values(ascending=True).reset_index(),
+        # Regional
+        "rev_by_region": rev("region").sort_values(ascending=True).reset_index(),
+        "top_countries": _top_by_revenue(df, "country", 20),
+        "rev_region_cat": rev(["region", "category"]).unstack("category", fill_value=0),
+        "rev_region_year": rev(["region", "year"]).reset_index(),
+        # Customer
+        "rev_segment_year": rev(["customer_segment", "year"]).reset_index(),
+        "segment_counts": _counts(df["customer_segment"], "segment"),
+        "age_group_counts": _counts(df["customer_age_group"], "age_group"),
+        "return_counts": _counts(df["return_status"], "status"),
+        "prev_os_counts": _counts(df["previous_device_os"], "os"),
+        "rating_age_cat": df.groupby(["customer_age_group", "category"], observed=True)[
+            "customer_rating"].mean().unstack(),
+        # Channels
+        "rev_by_channel": by_ch["revenue_usd"].sort_values(
+            ascending=True).reset_index(),
+        "rev_channel_cat": rev(["sales_channel", "category"]).unstack(
+            "category", fill_value=0),
+        "rev_channel_year": rev(["sales_channel", "year"]).reset_index(),
+        "aov_by_channel": (by_ch["revenue_usd"] / by_ch["n"]).rename(
+            "revenue_usd").sort_values(ascending=True).reset_index(),
+        "payment_counts": _counts(df["payment_method"], "method"),
+        "rev_payment_segment": df.groupby(["payment_method", "customer_segment"], observed=True)[
+            "revenue_usd"].sum().reset_index(),
+    }
+
+
+@st.cache_data(show_spinner=False)
+def correlation(file_bytes: bytes, years_t: tuple, regions_t: tuple,
+                cats_t: tuple) -> pd.DataFrame:
+    """Pearson correlation of the numeric features, computed in float32."""
+    df = _apply_filters(_parse_uploaded(file_bytes), years_t, regions_t, cats_t)
+    arr = df[NUMERIC_COLS].dropna().to_numpy(dtype=np.float32)
+    corr = np.corrcoef(arr, rowvar=False, dtype=np.float32)
+    return pd.DataFrame(corr, index=NUMERIC_COLS, columns=NUMERIC_COLS)
+
+
+DESCRIBE_COLS = ["unit_price_usd", "discount_pct",
+                 "units_sold", "revenue_usd", "customer_rating"]
+
+
+@st.cache_data(show_spinner=False)
+def describe_stats(file_bytes: bytes, years_t: tuple, regions_t: tuple,
+                   cats_t: tuple) -> pd.DataFrame:
+    """describe() of the headline numeric columns; rounding is left to the table."""
+    df = _apply_filters(_parse_uploaded(file_bytes), years_t, regions_t, cats_t)
+    return df[DESCRIBE_COLS].describe()
 
 
 # ── Sidebar ───────────────────────────────────────────────────────────────────
@@ -53,20 +277,23 @@ with st.sidebar:
     uploaded = st.file_uploader("Upload CSV", type="csv")
     st.markdown("---")
     if uploaded:
-        df_raw = pd.read_csv(uploaded, parse_dates=["sale_date"])
-        df_raw["month_num"] = pd.to_datetime(df_raw["sale_date"]).dt.month
-        df_raw["year"] = df_raw["year"].astype(str)
+        # Copied once per rerun and shared by every cached helper below.
+        file_bytes = uploaded.getvalue()
+        df_raw = _parse_uploaded(file_bytes)
     else:
         st.info("Upload `samsung_global_sales_dataset.csv` to begin.")
         st.stop()
 
     st.markdown("### 🔧 Filters")
-    years = st.multiselect("Year", sorted(
-        df_raw["year"].unique()), default=sorted(df_raw["year"].unique()))
-    regions = st.multiselect("Region", sorted(
-        df_raw["region"].unique()), default=sorted(df_raw["region"].unique()))
-    categories = st.multiselect("Category", sorted(
-        df_raw["category"].unique()), default=sorted(df_raw["category"].unique()))
+    # Selections are buffered until Apply, so several edits cost a single rerun.
+    with st.form("filters"):
+        years = st.multiselect("Year", sorted(
+            df_raw["year"].unique()), default=sorted(df_raw["year"].unique()))
+        regions = st.multiselect("Region", sorted(
+            df_raw["region"].unique()), default=sorted(df_raw["region"].unique()))
+        categories = st.multiselect("Category", sorted(
+            df_raw["category"].unique()), default=sorted(df_raw["category"].unique()))
+        st.form_submit_button("Apply")
 
     st.markdown("---")
     st.markdown("### 📊 Navigation")
@@ -80,16 +307,16 @@ with st.sidebar:
     ])
 
 # ── Apply Filters ─────────────────────────────────────────────────────────────
-df = df_raw[
-    df_raw["year"].isin(years) &
-    df_raw["region"].isin(regions) &
-    df_raw["category"].isin(categories)
-].copy()
+filter_key = (tuple(sorted(years)), tuple(sorted(regions)),
+              tuple(sorted(categories)))
+df = _apply_filters(df_raw, *filter_key)
 
 if df.empty:
     st.warning("No data matches the current filters. Please adjust the sidebar.")
     st.stop()
 
+agg = aggregate(file_bytes, *filter_key)
+
 # ══════════════════════════════════════════════════════════════════════════════
 #  🏠 OVERVIEW
 # ══════════════════════════════════════════════════════════════════════════════
@@ -100,18 +327,19 @@ if page == "🏠 Overview":
     st.markdown("---")
 
     # KPIs
+    kpis = agg["kpis"]
     k1, k2, k3, k4, k5, k6 = st.columns(6)
     k1.metric(label="💰 Total Revenue",
-              value=f"${df['revenue_usd'].sum()/1e6:.2f}M")
+              value=f"${kpis['revenue']/1e6:.2f}M")
     k2.metric(label="🧾 Transactions", value=f"{len(df):,}")
     k3.metric(label="📦 Avg Order Value",
-              value=f"${df['revenue_usd'].mean():,.0f}")
+              value=f"${kpis['aov']:,.0f}")
     k4.metric(label="↩️ Return Rate",
-              value=f"{(df['return_status'] == 'Returned').mean()*100:.1f}%")
+              value=f"{kpis['return_rate']*100:.1f}%")
     k5.metric(label="⭐ Avg Rating",
-              value=f"{df['customer_rating'].mean():.2f}")
+              value=f"{kpis['rating']:.2f}")
     k6.metric(label="🏷️ Avg Discount",
-              value=f"{df['discount_pct'].mean():.1f}%")
+              value=f"{kpis['discount']:.1f}%")
     st.markdown("---")
 
     # Revenue by Year
@@ -119,7 +347,7 @@ if page == "🏠 Overview":
     # Revenue by Year
     with col1:
         st.subheader("Revenue by Year")
-        yr = df.groupby("year")["revenue_usd"].sum().reset_index()
+        yr = agg["rev_by_year"]
         fig = px.bar(yr, x="year", y="revenue_usd", color="year",
                      labels={"revenue_usd": "Revenue (USD)", "year": "Year"},
                      color_discrete_sequence=COLORS, template="plotly_dark")
@@ -130,7 +358,7 @@ if page == "🏠 Overview":
     # Revenue by Quarter
     with col2:
         st.subheader("Revenue by Quarter (aggregated)")
-        qtr = df.groupby("quarter")["revenue_usd"].sum().reset_index()
+        qtr = agg["rev_by_quarter"]
         fig = px.bar(qtr, x="quarter", y="revenue_usd", color="quarter",
                      labels={"revenue_usd": "Revenue (USD)"},
                      color_discrete_sequence=COLORS, template="plotly_dark")
@@ -140,10 +368,7 @@ if page == "🏠 Overview":
 
      # Monthly Trend
     st.subheader("Monthly Revenue Trend")
-    monthly = df.groupby(["year", "month_num"])[
-        "revenue_usd"].sum().reset_index()
-    monthly["period"] = monthly["year"].astype(
-        str) + "-" + monthly["month_num"].astype(str).str.zfill(2)
+    monthly = agg["monthly"]
     fig = px.line(monthly, x="period", y="revenue_usd", color="year",
                   labels={"revenue_usd": "Revenue (USD)", "period": "Month"},
                   color_discrete_sequence=COLORS, template="plotly_dark",
@@ -153,9 +378,7 @@ if page == "🏠 Overview":
 
     # Revenue & Units heatmap: Year x Quarter
     st.subheader("Revenue Heatmap — Year × Quarter")
-    heat = df.groupby(["year", "quarter"])["revenue_usd"].sum().reset_index()
-    heat_pivot = heat.pivot(
-        index="year", columns="quarter", values="revenue_usd")
+    heat_pivot = agg["rev_year_quarter"]
     fig = px.imshow(heat_pivot, text_auto=".2s", color_continuous_scale="Blues",
                     template="plotly_dark", aspect="auto")
     fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
@@ -163,9 +386,10 @@ if page == "🏠 Overview":
 
     # Descriptive stats
     st.subheader("📋 Descriptive Statistics")
-    num_cols = ["unit_price_usd", "discount_pct",
-                "units_sold", "revenue_usd", "customer_rating"]
-    st.dataframe(df[num_cols].describe().round(2), use_container_width=True)
+    st.dataframe(describe_stats(file_bytes, *filter_key),
+                 use_container_width=True,
+                 column_config={c: st.column_config.NumberColumn(format="%.2f")
+                                for c in DESCRIBE_COLS})
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  📦 PRODUCT ANALYSIS
@@ -177,8 +401,7 @@ elif page == "📦 Product Analysis":
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Revenue by Category")
-        cat = df.groupby("category")["revenue_usd"].sum(
-        ).sort_values(ascending=True).reset_index()
+        cat = agg["rev_by_category"]
         fig = px.bar(cat, x="revenue_usd", y="category", orientation="h",
                      color="category", color_discrete_sequence=COLORS, template="plotly_dark",
                      labels={"revenue_usd": "Revenue (USD)", "category": "Category"})
@@ -188,9 +411,7 @@ elif page == "📦 Product Analysis":
 
     with col2:
         st.subheader("Transaction Count by Category")
-        cat_cnt = df["category"].value_counts().reset_index()
-        # st.dataframe(cat_cnt)
-        cat_cnt.columns = ["category", "count"]
+        cat_cnt = agg["category_counts"]
         fig = px.pie(cat_cnt, names="category", values="count",
                      color_discrete_sequence=COLORS, template="plotly_dark", hole=0.45)
         fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
@@ -198,8 +419,7 @@ elif page == "📦 Product Analysis":
 
     # Top products
     st.subheader("Top 15 Products by Revenue")
-    top = df.groupby("product_name")["revenue_usd"].sum(
-    ).sort_values(ascending=False).head(15).reset_index()
+    top = agg["top_products"]
     fig = px.bar(top, x="revenue_usd", y="product_name", orientation="h",
                  color="revenue_usd", color_continuous_scale="Blues", template="plotly_dark",
                  labels={"revenue_usd": "Revenue (USD)", "product_name": "Product"})
@@ -211,7 +431,7 @@ elif page == "📦 Product Analysis":
 
     with col3:
         st.subheader("5G vs Non-5G Revenue")
-        fg = df.groupby("is_5g")["revenue_usd"].sum().reset_index()
+        fg = agg["rev_by_5g"]
         fig = px.pie(fg, names="is_5g", values="revenue_usd", hole=0.5,
                      color_discrete_sequence=["#1565ff", "#00c6ff"], template="plotly_dark")
         fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
@@ -219,8 +439,7 @@ elif page == "📦 Product Analysis":
 
     with col4:
         st.subheader("Avg Rating by Category")
-        rat = df.groupby("category")["customer_rating"].mean(
-        ).sort_values(ascending=True).reset_index()
+        rat = agg["rating_by_category"]
         fig = px.bar(rat, x="customer_rating", y="category", orientation="h",
                      color="customer_rating", color_continuous_scale="Tealgrn",
                      template="plotly_dark", range_x=[3.5, 4.0])
@@ -229,19 +448,39 @@ elif page == "📦 Product Analysis":
 
     # Discount distribution
     st.subheader("Discount % Distribution by Category")
-    fig = px.box(df, x="category", y="discount_pct", color="category",
-                 color_discrete_sequence=COLORS, template="plotly_dark",
-                 labels={"discount_pct": "Discount (%)", "category": "Category"})
+    fig = fast_box(df, "discount_pct", "category", label="Discount (%)")
+    fig.update_layout(xaxis_title="Category")
     fig.update_layout(showlegend=False, plot_bgcolor="#0b1627",
                       paper_bgcolor="#0b1627")
     st.plotly_chart(fig, use_container_width=True)
 
     # Revenue vs Units scatter
     st.subheader("Unit Price vs Revenue (by Category)")
-    fig = px.scatter(df, x="unit_price_usd", y="revenue_usd", color="category",
-                     size="units_sold", hover_data=["product_name"],
-                     color_discrete_sequence=COLORS, template="plotly_dark", opacity=0.6,
-                     labels={"unit_price_usd": "Unit Price (USD)", "revenue_usd": "Revenue (USD)"})
+    if len(df) > SCATTER_MAX_POINTS:
+        # Too many markers for the browser: bin each category on a shared grid.
+        pts = df[["category", "unit_price_usd", "revenue_usd"]].dropna()
+        x_edges = np.histogram_bin_edges(pts["unit_price_usd"], bins=60)
+        y_edges = np.histogram_bin_edges(pts["revenue_usd"], bins=60)
+        cats = [c for c, _ in pts.groupby("category", observed=True)]
+        counts = np.stack([
+            np.histogram2d(g["unit_price_usd"], g["revenue_usd"],
+                           bins=[x_edges, y_edges])[0].T
+            for _, g in pts.groupby("category", observed=True)])
+        counts[counts == 0] = np.nan
+        fig = px.imshow(counts, x=(x_edges[:-1] + x_edges[1:]) / 2,
+                        y=(y_edges[:-1] + y_edges[1:]) / 2, origin="lower",
+                        facet_col=0, facet_col_wrap=3, aspect="auto",
+                        color_continuous_scale="Blues", template="plotly_dark",
+                        labels={"x": "Unit Price (USD)", "y": "Revenue (USD)",
+                                "color": "Transactions"})
+        fig.for_each_annotation(
+            lambda a: a.update(text=str(cats[int(a.text.split("=")[-1])])))
+    else:
+        fig = px.scatter(df, x="unit_price_usd", y="revenue_usd", color="category",
+                         size="units_sold", hover_data=["product_name"],
+                         color_discrete_sequence=COLORS, template="plotly_dark", opacity=0.6,
+                         render_mode="webgl",
+                         labels={"unit_price_usd": "Unit Price (USD)", "revenue_usd": "Revenue (USD)"})
     fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
     st.plotly_chart(fig, use_container_width=True)
 
@@ -253,8 +492,7 @@ elif page == "🌍 Regional Analysis":
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Revenue by Region")
-        reg = df.groupby("region")["revenue_usd"].sum(
-        ).sort_values(ascending=True).reset_index()
+        reg = agg["rev_by_region"]
         fig = px.bar(reg, x="revenue_usd", y="region", orientation="h",
                      color="region", color_discrete_sequence=COLORS, template="plotly_dark")
         fig.update_layout(showlegend=False,
@@ -270,8 +508,7 @@ elif page == "🌍 Regional Analysis":
 
     # Top countries
     st.subheader("Top 20 Countries by Revenue")
-    country = df.groupby("country")["revenue_usd"].sum(
-    ).sort_values(ascending=False).head(20).reset_index()
+    country = agg["top_countries"]
     fig = px.bar(country, x="country", y="revenue_usd", color="revenue_usd",
                  color_continuous_scale="Blues", template="plotly_dark",
                  labels={"revenue_usd": "Revenue (USD)", "country": "Country"})
@@ -280,9 +517,7 @@ elif page == "🌍 Regional Analysis":
 
     # Region × Category heatmap
     st.subheader("Revenue Heatmap — Region × Category")
-    rc = df.groupby(["region", "category"])["revenue_usd"].sum().reset_index()
-    rc_pivot = rc.pivot(index="region", columns="category",
-                        values="revenue_usd").fillna(0)
+    rc_pivot = agg["rev_region_cat"]
     fig = px.imshow(rc_pivot, text_auto=".2s", color_continuous_scale="Blues",
                     template="plotly_dark", aspect="auto")
     fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
@@ -290,7 +525,7 @@ elif page == "🌍 Regional Analysis":
 
     # Region trend over years
     st.subheader("Regional Revenue Trend by Year")
-    ry = df.groupby(["region", "year"])["revenue_usd"].sum().reset_index()
+    ry = agg["rev_region_year"]
     fig = px.line(ry, x="year", y="revenue_usd", color="region",
                   markers=True, color_discrete_sequence=COLORS, template="plotly_dark",
                   labels={"revenue_usd": "Revenue (USD)", "year": "Year"})
@@ -308,8 +543,7 @@ elif page == "👤 Customer Analysis":
 
     with col1:
         st.subheader("Customer Segments")
-        seg = df["customer_segment"].value_counts().reset_index()
-        seg.columns = ["segment", "count"]
+        seg = agg["segment_counts"]
         fig = px.pie(seg, names="segment", values="count", hole=0.45,
                      color_discrete_sequence=COLORS, template="plotly_dark")
         fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
@@ -317,8 +551,7 @@ elif page == "👤 Customer Analysis":
 
     with col2:
         st.subheader("Age Group Distribution")
-        age = df["customer_age_group"].value_counts().reset_index()
-        age.columns = ["age_group", "count"]
+        age = agg["age_group_counts"]
         fig = px.bar(age, x="age_group", y="count", color="age_group",
                      color_discrete_sequence=COLORS, template="plotly_dark")
         fig.update_layout(showlegend=False,
@@ -327,8 +560,7 @@ elif page == "👤 Customer Analysis":
 
     # Revenue by segment
     st.subheader("Revenue by Customer Segment × Year")
-    seg_yr = df.groupby(["customer_segment", "year"])[
-        "revenue_usd"].sum().reset_index()
+    seg_yr = agg["rev_segment_year"]
     fig = px.bar(seg_yr, x="year", y="revenue_usd", color="customer_segment",
                  barmode="group", color_discrete_sequence=COLORS, template="plotly_dark",
                  labels={"revenue_usd": "Revenue (USD)"})
@@ -340,8 +572,7 @@ elif page == "👤 Customer Analysis":
 
     with col3:
         st.subheader("Return Status Breakdown")
-        ret = df["return_status"].value_counts().reset_index()
-        ret.columns = ["status", "count"]
+        ret = agg["return_counts"]
         fig = px.pie(ret, names="status", values="count", hole=0.5,
                      color_discrete_sequence=["#4ade80", "#f87171", "#f5a623"],
                      template="plotly_dark")
@@ -350,16 +581,13 @@ elif page == "👤 Customer Analysis":
 
     with col4:
         st.subheader("Customer Rating Distribution")
-        fig = px.histogram(df.dropna(subset=["customer_rating"]), x="customer_rating",
-                           nbins=20, color_discrete_sequence=["#1565ff"],
-                           template="plotly_dark", labels={"customer_rating": "Rating"})
+        fig = fast_hist(df["customer_rating"], nbins=20, label="Rating")
         fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
         st.plotly_chart(fig, use_container_width=True)
 
 # Previous device OS
     st.subheader("Previous Device OS (top sources)")
-    os_df = df["previous_device_os"].dropna().value_counts().reset_index()
-    os_df.columns = ["os", "count"]
+    os_df = agg["prev_os_counts"]
     fig = px.bar(os_df, x="os", y="count", color="os",
                  color_discrete_sequence=COLORS, template="plotly_dark")
     fig.update_layout(showlegend=False, plot_bgcolor="#0b1627",
@@ -369,8 +597,9 @@ elif page == "👤 Customer Analysis":
     # Rating by age group
     st.subheader("Avg Rating by Age Group × Category")
 
-    fig = px.density_heatmap(df.dropna(subset=["customer_rating"]), x="category", y="customer_age_group", z="customer_rating", histfunc="avg",   # automatically calculates mean
-                             text_auto=".2f", color_continuous_scale="RdBu", template="plotly_dark")
+    rating_pivot = agg["rating_age_cat"]
+    fig = px.imshow(rating_pivot, text_auto=".2f", color_continuous_scale="RdBu",
+                    template="plotly_dark", aspect="auto")
     fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627",
                       coloraxis_colorbar_title="Avg Rating")
     st.plotly_chart(fig, use_container_width=True)
@@ -386,8 +615,7 @@ elif page == "🛒 Sales Channels":
 
     with col1:
         st.subheader("Revenue by Sales Channel")
-        ch = df.groupby("sales_channel")["revenue_usd"].sum(
-        ).sort_values(ascending=True).reset_index()
+        ch = agg["rev_by_channel"]
         fig = px.bar(ch, x="revenue_usd", y="sales_channel", orientation="h",
                      color="sales_channel", color_discrete_sequence=COLORS, template="plotly_dark")
         fig.update_layout(showlegend=False,
@@ -396,26 +624,23 @@ elif page == "🛒 Sales Channels":
 
     with col2:
         st.subheader("Payment Method Distribution")
-        pay = df["payment_method"].value_counts().reset_index()
-        pay.columns = ["method", "count"]
+        pay = agg["payment_counts"]
         fig = px.pie(pay, names="method", values="count", hole=0.4,
                      color_discrete_sequence=COLORS, template="plotly_dark")
         fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
         st.plotly_chart(fig, use_container_width=True)
 
-    # Channel × Category Revenue Heatmap (Without Pivot)
+    # Channel × Category Revenue Heatmap
     st.subheader("Channel × Category Revenue Heatmap")
-    cc = df.groupby(["sales_channel", "category"])[
-        "revenue_usd"].sum().reset_index()
-    fig = px.density_heatmap(cc, x="category", y="sales_channel", z="revenue_usd",
-                             text_auto=".2s", color_continuous_scale="Blues", template="plotly_dark")
+    cc_pivot = agg["rev_channel_cat"]
+    fig = px.imshow(cc_pivot, text_auto=".2s", color_continuous_scale="Blues",
+                    template="plotly_dark", aspect="auto")
     fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
     st.plotly_chart(fig, use_container_width=True)
 
     # Channel trend
     st.subheader("Sales Channel Trend by Year")
-    cy = df.groupby(["sales_channel", "year"])[
-        "revenue_usd"].sum().reset_index()
+    cy = agg["rev_channel_year"]
     fig = px.line(cy, x="year", y="revenue_usd", color="sales_channel",
                   markers=True, color_discrete_sequence=COLORS, template="plotly_dark")
     fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
@@ -424,8 +649,7 @@ elif page == "🛒 Sales Channels":
     col3, col4 = st.columns(2)
     with col3:
         st.subheader("Avg Order Value by Channel")
-        aov = df.groupby("sales_channel")["revenue_usd"].mean(
-        ).sort_values(ascending=True).reset_index()
+        aov = agg["aov_by_channel"]
         fig = px.bar(aov, x="revenue_usd", y="sales_channel", orientation="h",
                      color="revenue_usd", color_continuous_scale="Blues", template="plotly_dark",
                      labels={"revenue_usd": "Avg Revenue (USD)"})
@@ -434,8 +658,7 @@ elif page == "🛒 Sales Channels":
 
     with col4:
         st.subheader("Payment Method × Segment")
-        ps = df.groupby(["payment_method", "customer_segment"])[
-            "revenue_usd"].sum().reset_index()
+        ps = agg["rev_payment_segment"]
         fig = px.bar(ps, x="payment_method", y="revenue_usd", color="customer_segment",
                      barmode="stack", color_discrete_sequence=COLORS, template="plotly_dark",
                      labels={"revenue_usd": "Revenue (USD)"})
@@ -469,9 +692,7 @@ elif page == "🔬 Data Quality":
 
     st.markdown("---")
     st.subheader("Correlation Matrix (Numeric Features)")
-    num = df[["unit_price_usd", "discount_pct", "units_sold",
-              "discounted_price_usd", "revenue_usd", "customer_rating"]].dropna()
-    corr = num.corr()
+    corr = correlation(file_bytes, *filter_key)
     fig = px.imshow(corr, text_auto=".2f", color_continuous_scale="RdBu",
                     template="plotly_dark", color_continuous_midpoint=0)
     fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
@@ -481,26 +702,27 @@ elif page == "🔬 Data Quality":
     st.subheader("Outlier Detection — Revenue Distribution")
     col1, col2 = st.columns(2)
     with col1:
-        fig = px.box(df, y="revenue_usd", color="category",
-                     color_discrete_sequence=COLORS, template="plotly_dark",
-                     labels={"revenue_usd": "Revenue (USD)"})
+        fig = fast_box(df, "revenue_usd", "category", label="Revenue (USD)")
         fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
-        fig = px.histogram(df, x="revenue_usd", nbins=50,
-                           color_discrete_sequence=["#1565ff"], template="plotly_dark",
-                           labels={"revenue_usd": "Revenue (USD)"})
+        fig = fast_hist(df["revenue_usd"], nbins=50, label="Revenue (USD)")
         fig.update_layout(plot_bgcolor="#0b1627", paper_bgcolor="#0b1627")
         st.plotly_chart(fig, use_container_width=True)
 
     st.markdown("---")
     st.subheader("📄 Raw Data Explorer")
-    st.dataframe(df.head(500), use_container_width=True)
+    # float32 columns would otherwise display as e.g. 1246.77002.
+    st.dataframe(df.head(500), use_container_width=True,
+                 column_config={c: st.column_config.NumberColumn(format="%.2f")
+                                for c in NUMERIC_COLS
+                                if pd.api.types.is_float_dtype(df[c])})
 
     st.download_button(
         label="⬇️ Download Filtered Data as CSV",
-        data=df.to_csv(index=False).encode("utf-8"),
+        # Callable data is only serialised when the button is clicked.
+        data=lambda: df.to_csv(index=False).encode("utf-8"),
         file_name="samsung_filtered.csv",
         mime="text/csv"
     )